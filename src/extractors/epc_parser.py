@@ -1,11 +1,21 @@
+import asyncio
 import logging
+import random
 import time
 from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Any, Dict, Iterable, List, Optional, Set
 from urllib.parse import urljoin, urlparse
 
+import aiohttp
+import lxml.html
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
+from lxml.html import HtmlElement
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from extractors import utils_validation
 
@@ -13,11 +23,89 @@ LOGGER = logging.getLogger("extractors.epc_parser")
 
 DEFAULT_BASE = "https://find-energy-certificate.service.gov.uk"
 
+# tag names that may hold a field label, in lookup priority order
+LABEL_TAGS = ("dt", "th", "strong", "span", "p", "label")
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# certificate pages are queried through precompiled XPath on the lxml tree
+_XP_TEXT = etree.XPath(".//text()")
+_XP_LABEL_TAGS = etree.XPath(" | ".join(f"//{name}" for name in LABEL_TAGS))
+_XP_NEXT_SIBLING = etree.XPath("following-sibling::*[1]")
+_XP_RATING = (
+    etree.XPath(f"(//*[{_has_class('epc-rating')}])[1]"),
+    etree.XPath(f"(//*[{_has_class('rating-band')}])[1]"),
+)
+_XP_TABLES = etree.XPath("//table")
+_XP_HEADER_CELLS = etree.XPath(".//th")
+_XP_CELLS = etree.XPath(".//td | .//th")
+_XP_SECTION_HEADINGS = etree.XPath("//h2 | //h3 | //h4")
+_XP_NEXT_TABLE = etree.XPath("following::table[1]")
+
+def _element_text(el: HtmlElement, separator: str = "") -> str:
+    """
+    Equivalent of BeautifulSoup's get_text(separator, strip=True).
+    """
+    return separator.join(t.strip() for t in _XP_TEXT(el) if t.strip())
+
+def _parse_document(html: str) -> HtmlElement:
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # str input with an <?xml encoding=...?> declaration (XHTML) is
+        # rejected by lxml; hand it the encoded bytes instead
+        return lxml.html.document_fromstring(html.encode("utf-8"))
+    except etree.ParserError:
+        # empty or whitespace-only body
+        return lxml.html.document_fromstring("<html></html>")
+
+# listing pages only matter for their links, so skip building the rest of the tree
+LISTING_LINKS = SoupStrainer("a", href=True)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_AFTER_STATUSES = frozenset({429, 503})
+
 @dataclass
 class EPCParserConfig:
     timeout_seconds: int = 20
     delay_seconds: float = 0.0
     base_url: str = DEFAULT_BASE
+    max_attempts: int = 6
+    backoff_base: float = 0.5
+    backoff_cap: float = 30.0
+
+class _JitteredRetry(Retry):
+    """
+    urllib3 Retry whose capped exponential backoff is spread by a random
+    factor, so throttled workers don't all come back at the same instant.
+    Retry-After headers still take precedence, capped at backoff_max.
+    """
+
+    def get_backoff_time(self) -> float:
+        return super().get_backoff_time() * random.uniform(0.5, 1.5)
+
+    def parse_retry_after(self, retry_after: str) -> float:
+        return min(super().parse_retry_after(retry_after), self.backoff_max)
+
+def _parse_retry_after(value: str) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header, in delta-seconds or HTTP-date
+    form; None if the header can't be understood.
+    """
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
 
 class EPCParser:
     def __init__(
@@ -26,11 +114,44 @@ class EPCParser:
         delay_seconds: float = 0.0,
         base_url: str = DEFAULT_BASE,
     ) -> None:
-        self.session = session or requests.Session()
         self.config = EPCParserConfig(delay_seconds=delay_seconds, base_url=base_url)
+        if session is None:
+            session = requests.Session()
+            self._mount_pooled_adapter(session)
+        self.session = session
+        # monotonic time before which the next async request may not start
+        self._next_request_at = 0.0
+
+    def _mount_pooled_adapter(self, session: requests.Session) -> None:
+        # a single host serves every request, so keep plenty of sockets alive
+        # and reuse them instead of paying a TLS handshake per certificate
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=_JitteredRetry(
+                total=self.config.max_attempts - 1,
+                backoff_factor=self.config.backoff_base,
+                backoff_max=self.config.backoff_cap,
+                status_forcelist=sorted(RETRY_STATUSES),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            ),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"Connection": "keep-alive", "Accept-Encoding": "gzip, deflate"})
 
     # ----- HTTP helpers -------------------------------------------------
 
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            # never let the server park a concurrency slot beyond the cap
+            seconds = _parse_retry_after(retry_after)
+            if seconds is not None:
+                return min(self.config.backoff_cap, seconds)
+        delay = min(self.config.backoff_cap, self.config.backoff_base * 2**attempt)
+        return delay * random.uniform(0.5, 1.5)
+
     def _request(self, url: str) -> Optional[str]:
         try:
             LOGGER.debug("Fetching URL: %s", url)
@@ -38,6 +159,8 @@ class EPCParser:
             if resp.status_code != 200:
                 LOGGER.warning("Non-200 status %s for URL %s", resp.status_code, url)
                 return None
+            # the register always serves UTF-8; skip charset sniffing on the body
+            resp.encoding = "utf-8"
             return resp.text
         except requests.RequestException as exc:
             LOGGER.error("Request error for %s: %s", url, exc)
@@ -52,35 +175,101 @@ class EPCParser:
     def fetch_certificate(self, url: str) -> Optional[str]:
         return self._request(url)
 
+    # ----- Async HTTP helpers -------------------------------------------
+
+    def create_async_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(limit_per_host=64, keepalive_timeout=85)
+        timeout = aiohttp.ClientTimeout(total=self.config.timeout_seconds)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def _throttle(self) -> None:
+        # spaces out request starts across all concurrent tasks, so the delay
+        # caps the overall rate however many slots are open; nothing awaits
+        # between reading and bumping the gate, so no lock is needed
+        if self.config.delay_seconds <= 0:
+            return
+        now = time.monotonic()
+        start = max(now, self._next_request_at)
+        self._next_request_at = start + self.config.delay_seconds
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def _request_async(self, session: aiohttp.ClientSession, url: str) -> Optional[str]:
+        # mirrors the adapter retry policy used by the synchronous session
+        for attempt in range(self.config.max_attempts):
+            last_attempt = attempt == self.config.max_attempts - 1
+            retry_after: Optional[str] = None
+            await self._throttle()
+            try:
+                LOGGER.debug("Fetching URL: %s", url)
+                async with session.get(url) as resp:
+                    if resp.status == 200:
+                        return await resp.text(encoding="utf-8", errors="replace")
+                    if resp.status not in RETRY_STATUSES or last_attempt:
+                        LOGGER.warning("Non-200 status %s for URL %s", resp.status, url)
+                        return None
+                    if resp.status in RETRY_AFTER_STATUSES:
+                        retry_after = resp.headers.get("Retry-After")
+                    reason = f"status {resp.status}"
+            except (
+                aiohttp.ClientConnectionError,
+                aiohttp.ServerDisconnectedError,
+                asyncio.TimeoutError,
+            ) as exc:
+                # transient failures: worth another attempt
+                if last_attempt:
+                    LOGGER.error("Request error for %s: %s", url, exc)
+                    return None
+                reason = str(exc) or type(exc).__name__
+            except aiohttp.ClientError as exc:
+                # permanent (invalid URL, bad payload, ...): retrying won't help
+                LOGGER.error("Request error for %s: %s", url, exc)
+                return None
+
+            delay = self._retry_delay(attempt, retry_after)
+            LOGGER.info("Retrying %s in %.1fs (%s)", url, delay, reason)
+            await asyncio.sleep(delay)
+        return None
+
+    async def fetch_listing_page_async(
+        self, session: aiohttp.ClientSession, url: str
+    ) -> Optional[str]:
+        return await self._request_async(session, url)
+
+    async def fetch_certificate_async(
+        self, session: aiohttp.ClientSession, url: str
+    ) -> Optional[str]:
+        return await self._request_async(session, url)
+
     # ----- Listing parsing ----------------------------------------------
 
     @staticmethod
     def _build_absolute_url(href: str, base_url: str) -> str:
-        if href.startswith("http://") or href.startswith("https://"):
+        if href.startswith(("http://", "https://")):
             return href
         if href.startswith("/"):
             return urljoin(DEFAULT_BASE, href)
         return urljoin(base_url, href)
 
     def parse_listing_page(self, html: str, base_url: str) -> List[str]:
-        soup = BeautifulSoup(html, "lxml")
-        certificate_urls: Set[str] = set()
+        links = BeautifulSoup(html, "lxml", parse_only=LISTING_LINKS)
 
         # heuristic: EPC certificate links contain '/energy-certificate/'
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
-            if "/energy-certificate/" in href:
-                full = self._build_absolute_url(href, base_url)
-                certificate_urls.add(full)
+        # (raw hrefs are deduplicated first so each is resolved only once)
+        hrefs: Set[str] = {
+            a["href"] for a in links.find_all("a", href=True) if "/energy-certificate/" in a["href"]
+        }
 
         # Fallback: some pages might expose direct certificate URLs in text
-        if not certificate_urls:
-            text = soup.get_text(" ", strip=True)
+        # (needs the full document, so only parsed when no links matched)
+        if not hrefs:
+            text = BeautifulSoup(html, "lxml").get_text(" ", strip=True)
             token_prefix = "/energy-certificate/"
             for token in text.split():
                 if token_prefix in token:
-                    href = token[token.find(token_prefix) :]
-                    certificate_urls.add(self._build_absolute_url(href, base_url))
+                    hrefs.add(token[token.find(token_prefix) :])
+
+        certificate_urls: Set[str] = {self._build_absolute_url(href, base_url) for href in hrefs}
 
         LOGGER.debug("Parsed %d certificate URLs from listing.", len(certificate_urls))
         return sorted(certificate_urls)
@@ -88,55 +277,85 @@ class EPCParser:
     # ----- Certificate parsing ------------------------------------------
 
     @staticmethod
-    def _first_text(soup: BeautifulSoup, selectors: Iterable[str]) -> Optional[str]:
-        for sel in selectors:
-            el = soup.select_one(sel)
-            if el and el.get_text(strip=True):
-                return el.get_text(strip=True)
+    def _first_text(doc: HtmlElement, queries: Iterable[etree.XPath]) -> Optional[str]:
+        for query in queries:
+            found = query(doc)
+            if found:
+                text = _element_text(found[0])
+                if text:
+                    return text
         return None
 
     @staticmethod
-    def _text_after_label(soup: BeautifulSoup, label: str) -> Optional[str]:
+    def _label_value(tag: HtmlElement) -> Optional[str]:
+        # try a sibling
+        sibs = _XP_NEXT_SIBLING(tag)
+        if sibs:
+            sib_text = _element_text(sibs[0])
+            if sib_text:
+                return sib_text
+        # or parent-based
+        parent = tag.getparent()
+        if parent is not None:
+            parent_text = _element_text(parent, " ")
+            if parent_text:
+                return parent_text
+        return None
+
+    @classmethod
+    def _build_label_index(cls, doc: HtmlElement) -> Dict[str, str]:
         """
-        Generic helper that finds a label (dt, th, strong, etc.) and returns
-        text from the adjacent element (dd, td, span, etc.).
+        Single pass over every label-like tag (dt, th, strong, etc.), mapping
+        its lower-cased text to the text of the adjacent element (dd, td,
+        span, etc.). Earlier tag names take precedence, as do earlier tags of
+        the same name.
+        """
+        buckets: Dict[str, Dict[str, str]] = {name: {} for name in LABEL_TAGS}
+        for tag in _XP_LABEL_TAGS(doc):
+            key = _element_text(tag, " ").lower()
+            bucket = buckets[tag.tag]
+            if not key or key in bucket:
+                continue
+            value = cls._label_value(tag)
+            if value:
+                bucket[key] = value
+
+        index: Dict[str, str] = {}
+        for name in LABEL_TAGS:
+            for key, value in buckets[name].items():
+                index.setdefault(key, value)
+        return index
+
+    @staticmethod
+    def _text_after_label(index: Dict[str, str], label: str) -> Optional[str]:
+        """
+        Returns the value of the first indexed label containing `label`.
         """
         label = label.lower()
-        for tag_name in ("dt", "th", "strong", "span", "p", "label"):
-            for tag in soup.find_all(tag_name):
-                if label in tag.get_text(" ", strip=True).lower():
-                    # try a sibling
-                    sib = tag.find_next_sibling()
-                    if sib and sib.get_text(strip=True):
-                        return sib.get_text(strip=True)
-                    # or parent-based
-                    if tag.parent and tag.parent is not tag:
-                        parent_text = tag.parent.get_text(" ", strip=True)
-                        if parent_text:
-                            return parent_text
-        return None
+        return next((value for key, value in index.items() if label in key), None)
 
     @staticmethod
-    def _parse_features(soup: BeautifulSoup) -> List[Dict[str, Any]]:
+    def _parse_features(doc: HtmlElement) -> List[Dict[str, Any]]:
         features: List[Dict[str, Any]] = []
 
         # try table with headings like "Feature / Description / Rating"
-        tables = soup.find_all("table")
-        for table in tables:
-            headers = [th.get_text(strip=True).lower() for th in table.find_all("th")]
+        for table in _XP_TABLES(doc):
+            headers = [_element_text(th).lower() for th in _XP_HEADER_CELLS(table)]
             if not headers:
                 continue
             if not any("feature" in h for h in headers):
                 continue
 
             # assume first 3 columns: name, description, rating
-            for row in table.find_all("tr")[1:]:
-                cols = row.find_all(["td", "th"])
+            rows = table.iter("tr")
+            next(rows, None)  # skip the heading row
+            for row in rows:
+                cols = _XP_CELLS(row)
                 if not cols:
                     continue
-                name = cols[0].get_text(strip=True) if len(cols) > 0 else None
-                description = cols[1].get_text(strip=True) if len(cols) > 1 else None
-                rating = cols[2].get_text(strip=True) if len(cols) > 2 else None
+                name = _element_text(cols[0]) if len(cols) > 0 else None
+                description = _element_text(cols[1]) if len(cols) > 1 else None
+                rating = _element_text(cols[2]) if len(cols) > 2 else None
                 if name or description or rating:
                     features.append(
                         {
@@ -148,24 +367,27 @@ class EPCParser:
         return features
 
     @staticmethod
-    def _parse_changes(soup: BeautifulSoup) -> List[Dict[str, Any]]:
+    def _parse_changes(doc: HtmlElement) -> List[Dict[str, Any]]:
         changes: List[Dict[str, Any]] = []
 
         # look for sections that mention "Suggested improvements" or similar
-        for header in soup.find_all(["h2", "h3", "h4"]):
-            header_text = header.get_text(" ", strip=True).lower()
+        for header in _XP_SECTION_HEADINGS(doc):
+            header_text = _element_text(header, " ").lower()
             if "improvement" not in header_text and "recommended measure" not in header_text:
                 continue
 
-            for table in header.find_all_next("table", limit=2):
-                for row in table.find_all("tr")[1:]:
-                    cols = row.find_all(["td", "th"])
+            # only the first table after each header is considered
+            for table in _XP_NEXT_TABLE(header):
+                rows = table.iter("tr")
+                next(rows, None)  # skip the heading row
+                for row in rows:
+                    cols = _XP_CELLS(row)
                     if not cols:
                         continue
-                    name = cols[0].get_text(strip=True) if len(cols) > 0 else None
-                    installation_cost = cols[1].get_text(strip=True) if len(cols) > 1 else None
-                    yearly_saving = cols[2].get_text(strip=True) if len(cols) > 2 else None
-                    potential_rating = cols[3].get_text(strip=True) if len(cols) > 3 else None
+                    name = _element_text(cols[0]) if len(cols) > 0 else None
+                    installation_cost = _element_text(cols[1]) if len(cols) > 1 else None
+                    yearly_saving = _element_text(cols[2]) if len(cols) > 2 else None
+                    potential_rating = _element_text(cols[3]) if len(cols) > 3 else None
                     if name or installation_cost or yearly_saving or potential_rating:
                         changes.append(
                             {
@@ -175,11 +397,12 @@ class EPCParser:
                                 "potentialRating": potential_rating,
                             }
                         )
-                break  # don't process more than one table per header
         return changes
 
-    def parse_certificate_page(self, html: str, url: str) -> Dict[str, Any]:
-        soup = BeautifulSoup(html, "lxml")
+    @classmethod
+    def parse_certificate_page(cls, html: str, url: str) -> Dict[str, Any]:
+        doc = _parse_document(html)
+        index = cls._build_label_index(doc)
 
         record: Dict[str, Any] = {
             "url": url,
@@ -195,77 +418,69 @@ class EPCParser:
 
         # fallback: explicit label
         if not record.get("id"):
-            id_text = self._text_after_label(soup, "Certificate number")
+            id_text = cls._text_after_label(index, "Certificate number")
             if id_text:
                 record["id"] = id_text.split()[0]
 
         # Basic location info
-        record["postCode"] = self._text_after_label(soup, "Postcode")
-        record["locality"] = self._text_after_label(soup, "Town")
-        record["address"] = self._text_after_label(soup, "Address")
+        record["postCode"] = cls._text_after_label(index, "Postcode")
+        record["locality"] = cls._text_after_label(index, "Town")
+        record["address"] = cls._text_after_label(index, "Address")
 
         # Ratings and scores
-        record["rating"] = self._first_text(
-            soup,
-            [
-                ".epc-rating",
-                ".rating-band",
-                "span.epc-rating",
-                "p.epc-rating",
-            ],
-        ) or self._text_after_label(soup, "Rating")
-
-        record["propertyType"] = self._text_after_label(soup, "Property type")
-        record["floorArea"] = self._text_after_label(soup, "Total floor area")
-        record["currentScore"] = self._text_after_label(soup, "Current rating")
-        record["potentialScore"] = self._text_after_label(soup, "Potential rating")
+        record["rating"] = cls._first_text(doc, _XP_RATING) or cls._text_after_label(index, "Rating")
+
+        record["propertyType"] = cls._text_after_label(index, "Property type")
+        record["floorArea"] = cls._text_after_label(index, "Total floor area")
+        record["currentScore"] = cls._text_after_label(index, "Current rating")
+        record["potentialScore"] = cls._text_after_label(index, "Potential rating")
 
         # numerical cost/CO2-related fields
         record["primaryUsage"] = utils_validation.parse_number(
-            self._text_after_label(soup, "Primary energy use")
+            cls._text_after_label(index, "Primary energy use")
         )
         record["averageBill"] = utils_validation.parse_number(
-            self._text_after_label(soup, "Current costs")
+            cls._text_after_label(index, "Current costs")
         )
         record["potentialSaving"] = utils_validation.parse_number(
-            self._text_after_label(soup, "Potential savings")
+            cls._text_after_label(index, "Potential savings")
         )
         record["averageCostYear"] = utils_validation.parse_year(
-            self._text_after_label(soup, "Based on")
+            cls._text_after_label(index, "Based on")
         )
 
         record["co2Produces"] = utils_validation.parse_number(
-            self._text_after_label(soup, "Current emissions")
+            cls._text_after_label(index, "Current emissions")
         )
         record["co2Potential"] = utils_validation.parse_number(
-            self._text_after_label(soup, "Potential emissions")
+            cls._text_after_label(index, "Potential emissions")
         )
 
         # Features and recommended changes
-        record["features"] = self._parse_features(soup)
-        record["changes"] = self._parse_changes(soup)
+        record["features"] = cls._parse_features(doc)
+        record["changes"] = cls._parse_changes(doc)
 
         # Assessor details
-        record["assessorName"] = self._text_after_label(soup, "Assessor's name")
-        record["assessorPhone"] = self._text_after_label(soup, "Assessor's phone")
-        record["assessorEmail"] = self._text_after_label(soup, "Assessor's email")
+        record["assessorName"] = cls._text_after_label(index, "Assessor's name")
+        record["assessorPhone"] = cls._text_after_label(index, "Assessor's phone")
+        record["assessorEmail"] = cls._text_after_label(index, "Assessor's email")
 
-        record["accreditationScheme"] = self._text_after_label(soup, "Accreditation scheme")
-        record["accreditationAssessorID"] = self._text_after_label(
-            soup, "Accreditation number"
+        record["accreditationScheme"] = cls._text_after_label(index, "Accreditation scheme")
+        record["accreditationAssessorID"] = cls._text_after_label(
+            index, "Accreditation number"
         )
-        record["accreditationPhone"] = self._text_after_label(
-            soup, "Accreditation scheme phone"
+        record["accreditationPhone"] = cls._text_after_label(
+            index, "Accreditation scheme phone"
         )
-        record["accreditationEmail"] = self._text_after_label(
-            soup, "Accreditation scheme email"
+        record["accreditationEmail"] = cls._text_after_label(
+            index, "Accreditation scheme email"
         )
 
         # Dates and meta
-        record["assessmentDate"] = self._text_after_label(soup, "Date of assessment")
-        record["certificateDate"] = self._text_after_label(soup, "Date of certificate")
-        record["assessmentType"] = self._text_after_label(soup, "Type of assessment")
-        record["validtillDate"] = self._text_after_label(soup, "Expiry date")
+        record["assessmentDate"] = cls._text_after_label(index, "Date of assessment")
+        record["certificateDate"] = cls._text_after_label(index, "Date of certificate")
+        record["assessmentType"] = cls._text_after_label(index, "Type of assessment")
+        record["validtillDate"] = cls._text_after_label(index, "Expiry date")
 
         # expired flag will be set in normalize_record
         return record
\ No newline at end of file
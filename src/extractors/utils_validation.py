@@ -1,23 +1,65 @@
+import functools
 import logging
 import re
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
 from dateutil import parser as date_parser
 
 LOGGER = logging.getLogger("extractors.utils_validation")
 
-RE_NUMBER = re.compile(r"[-+]?\d*\.?\d+")
+# thousands separators are matched in place and stripped from the match only
+RE_NUMBER = re.compile(r"[-+]?(?:\d[\d,]*)?\.?\d+")
 RE_YEAR = re.compile(r"\b(19|20)\d{2}\b")
 
+VALID_BANDS = frozenset("ABCDEFG")
+
+# formats the EPC register actually emits, tried before the generic parser
+DATE_FORMATS = ("%d %B %Y", "%d %b %Y", "%Y-%m-%d", "%d/%m/%Y")
+
+# every record is padded out to this schema by normalize_record
+RECORD_DEFAULTS: Dict[str, Any] = {
+    "url": None,
+    "postCode": None,
+    "locality": None,
+    "address": None,
+    "rating": None,
+    "id": None,
+    "propertyType": None,
+    "floorArea": None,
+    "currentScore": None,
+    "potentialScore": None,
+    "primaryUsage": None,
+    "averageBill": None,
+    "potentialSaving": None,
+    "averageCostYear": None,
+    "co2Produces": None,
+    "co2Potential": None,
+    # placeholders only: normalize_record gives each record its own lists
+    "features": (),
+    "changes": (),
+    "assessorName": None,
+    "assessorPhone": None,
+    "assessorEmail": None,
+    "accreditationScheme": None,
+    "accreditationAssessorID": None,
+    "accreditationPhone": None,
+    "accreditationEmail": None,
+    "assessmentDate": None,
+    "certificateDate": None,
+    "assessmentType": None,
+    "validtillDate": None,
+    "expired": None,
+}
+
 def parse_number(value: Optional[str]) -> Optional[float]:
     if not value:
         return None
-    match = RE_NUMBER.search(value.replace(",", ""))
+    match = RE_NUMBER.search(value)
     if not match:
         return None
     try:
-        return float(match.group(0))
+        return float(match.group(0).replace(",", ""))
     except ValueError:
         return None
 
@@ -33,8 +75,18 @@ def parse_year(value: Optional[str]) -> Optional[int]:
         return None
 
 def parse_date(value: Optional[str]) -> Optional[datetime]:
-    if not value:
+    # non-strings (possibly unhashable) never reach the cache
+    if not value or not isinstance(value, str):
         return None
+    return _parse_date_cached(value)
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date_cached(value: str) -> Optional[datetime]:
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
     try:
         return date_parser.parse(value, dayfirst=True)
     except (ValueError, TypeError, OverflowError):
@@ -43,56 +95,33 @@ def parse_date(value: Optional[str]) -> Optional[datetime]:
 def is_expired(valid_till: Optional[str], reference: Optional[datetime] = None) -> Optional[bool]:
     if not valid_till:
         return None
-    ref = reference or datetime.utcnow()
+    ref = reference or datetime.now(timezone.utc)
     dt = parse_date(valid_till)
     if not dt:
         return None
+    # register dates carry no zone; compare everything as UTC
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    if ref.tzinfo is None:
+        ref = ref.replace(tzinfo=timezone.utc)
     return dt < ref
 
-def normalize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+def normalize_record(
+    record: Dict[str, Any],
+    reference: Optional[datetime] = None,
+) -> Dict[str, Any]:
     """
     Ensure all expected keys exist and derive computed fields like 'expired'.
+    Returns a new dict; the input record is left untouched. `reference` is
+    the time expiry is judged against, so batch callers can compute it once.
     """
-    defaults: Dict[str, Any] = {
-        "url": None,
-        "postCode": None,
-        "locality": None,
-        "address": None,
-        "rating": None,
-        "id": None,
-        "propertyType": None,
-        "floorArea": None,
-        "currentScore": None,
-        "potentialScore": None,
-        "primaryUsage": None,
-        "averageBill": None,
-        "potentialSaving": None,
-        "averageCostYear": None,
-        "co2Produces": None,
-        "co2Potential": None,
-        "features": [],
-        "changes": [],
-        "assessorName": None,
-        "assessorPhone": None,
-        "assessorEmail": None,
-        "accreditationScheme": None,
-        "accreditationAssessorID": None,
-        "accreditationPhone": None,
-        "accreditationEmail": None,
-        "assessmentDate": None,
-        "certificateDate": None,
-        "assessmentType": None,
-        "validtillDate": None,
-        "expired": None,
-    }
-
-    for key, default in defaults.items():
-        record.setdefault(key, default)
-
-    if record.get("expired") is None:
-        record["expired"] = is_expired(record.get("validtillDate"))
-
-    return record
+    # fresh lists so records never share the mutable defaults
+    merged = {**RECORD_DEFAULTS, "features": [], "changes": [], **record}
+
+    if merged.get("expired") is None:
+        merged["expired"] = is_expired(merged.get("validtillDate"), reference=reference)
+
+    return merged
 
 def validate_epc_record(record: Dict[str, Any]) -> Tuple[bool, List[str]]:
     errors: List[str] = []
@@ -107,7 +136,7 @@ def validate_epc_record(record: Dict[str, Any]) -> Tuple[bool, List[str]]:
         # Accept strings like "75 C" or "C" or "79 C"
         parts = rating.split()
         band = parts[-1]
-        if band not in list("ABCDEFG"):
+        if band not in VALID_BANDS:
             errors.append(f"Unexpected rating band: {record['rating']}")
 
     if record.get("validtillDate") and record.get("expired") is None:
@@ -1,9 +1,16 @@
 import argparse
-import json
+import asyncio
 import logging
+import multiprocessing
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+import orjson
 
 from extractors.epc_parser import EPCParser
 from extractors import utils_validation
@@ -14,6 +21,8 @@ from monitoring.tracker import (
 )
 from outputs.exporters import export_all
 
+DEFAULT_CONCURRENCY = 20
+
 def configure_logging(verbosity: int) -> None:
     level = logging.WARNING
     if verbosity == 1:
@@ -30,15 +39,13 @@ def configure_logging(verbosity: int) -> None:
 def load_config(path: Path) -> Dict[str, Any]:
     if not path.exists():
         raise FileNotFoundError(f"Config file not found: {path}")
-    with path.open("r", encoding="utf-8") as f:
-        config = json.load(f)
+    config = orjson.loads(path.read_bytes())
     return config
 
 def load_input_urls(path: Path) -> List[str]:
     if not path.exists():
         raise FileNotFoundError(f"Input file not found: {path}")
-    with path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = orjson.loads(path.read_bytes())
 
     if isinstance(data, list):
         # allow a plain list of URLs
@@ -48,7 +55,9 @@ def load_input_urls(path: Path) -> List[str]:
     return [str(u) for u in listing_urls]
 
 def deduplicate_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    seen = {}
+    # later duplicates replace earlier ones but keep the first one's position
+    positions: Dict[str, int] = {}
+    unique: List[Dict[str, Any]] = []
     anonymous_counter = 0
 
     for rec in records:
@@ -57,8 +66,45 @@ def deduplicate_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
             anonymous_counter += 1
             rec_id = f"anonymous-{anonymous_counter}"
             rec["id"] = rec_id
-        seen[rec_id] = rec
-    return list(seen.values())
+        pos = positions.get(rec_id)
+        if pos is None:
+            positions[rec_id] = len(unique)
+            unique.append(rec)
+        else:
+            unique[pos] = rec
+    return unique
+
+def _finalize_record(
+    record: Dict[str, Any],
+    cert_url: str,
+    reference: datetime,
+) -> Dict[str, Any]:
+    logger = logging.getLogger("main.full_crawl")
+    record["url"] = cert_url  # ensure URL is present
+
+    # normalize and validate
+    record = utils_validation.normalize_record(record, reference=reference)
+    is_valid, errors = utils_validation.validate_epc_record(record)
+    if not is_valid:
+        logger.warning(
+            "Validation problems for certificate %s: %s", record.get("id"), "; ".join(errors)
+        )
+    return record
+
+def _process_certificate(
+    parser: EPCParser,
+    cert_html: str,
+    cert_url: str,
+    reference: datetime,
+) -> Optional[Dict[str, Any]]:
+    try:
+        record = parser.parse_certificate_page(cert_html, url=cert_url)
+        return _finalize_record(record, cert_url, reference)
+    except Exception as exc:  # pragma: no cover - safety net
+        logging.getLogger("main.full_crawl").exception(
+            "Unexpected error parsing certificate %s: %s", cert_url, exc
+        )
+        return None
 
 def crawl_full(
     listing_urls: List[str],
@@ -66,6 +112,8 @@ def crawl_full(
 ) -> List[Dict[str, Any]]:
     logger = logging.getLogger("main.full_crawl")
     all_records: List[Dict[str, Any]] = []
+    # one reference time for the whole crawl when deciding expiry
+    reference = datetime.now(timezone.utc)
 
     for url in listing_urls:
         logger.info("Processing listing URL: %s", url)
@@ -83,20 +131,89 @@ def crawl_full(
                 logger.warning("Skipping certificate due to fetch error: %s", cert_url)
                 continue
 
-            try:
-                record = parser.parse_certificate_page(cert_html, url=cert_url)
-                record["url"] = cert_url  # ensure URL is present
-
-                # normalize and validate
-                record = utils_validation.normalize_record(record)
-                is_valid, errors = utils_validation.validate_epc_record(record)
-                if not is_valid:
-                    logger.warning(
-                        "Validation problems for certificate %s: %s", record.get("id"), "; ".join(errors)
-                    )
+            record = _process_certificate(parser, cert_html, cert_url, reference)
+            if record is not None:
                 all_records.append(record)
-            except Exception as exc:  # pragma: no cover - safety net
-                logger.exception("Unexpected error parsing certificate %s: %s", cert_url, exc)
+
+    return all_records
+
+def _parse_certificate_in_worker(cert_html: str, cert_url: str) -> Dict[str, Any]:
+    """
+    Entry point for parse pool processes. Parsing needs no HTTP state, so
+    no parser instance (and no requests session) is built in the workers.
+    """
+    return EPCParser.parse_certificate_page(cert_html, url=cert_url)
+
+async def _fetch_and_parse(
+    parser: EPCParser,
+    session: aiohttp.ClientSession,
+    cert_url: str,
+    sem: asyncio.BoundedSemaphore,
+    pool: ProcessPoolExecutor,
+    reference: datetime,
+) -> Optional[Dict[str, Any]]:
+    logger = logging.getLogger("main.full_crawl")
+    async with sem:
+        cert_html = await parser.fetch_certificate_async(session, cert_url)
+    if cert_html is None:
+        logger.warning("Skipping certificate due to fetch error: %s", cert_url)
+        return None
+
+    loop = asyncio.get_running_loop()
+    try:
+        record = await loop.run_in_executor(pool, _parse_certificate_in_worker, cert_html, cert_url)
+        return _finalize_record(record, cert_url, reference)
+    except Exception as exc:  # pragma: no cover - safety net
+        logger.exception("Unexpected error parsing certificate %s: %s", cert_url, exc)
+        return None
+
+async def crawl_full_async(
+    listing_urls: List[str],
+    parser: EPCParser,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> List[Dict[str, Any]]:
+    """
+    Concurrent variant of crawl_full: certificate pages of each listing are
+    fetched in parallel, with at most `concurrency` requests in flight, and
+    parsed across a pool of worker processes.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+
+    logger = logging.getLogger("main.full_crawl")
+    all_records: List[Dict[str, Any]] = []
+    sem = asyncio.BoundedSemaphore(concurrency)
+    reference = datetime.now(timezone.utc)
+
+    # spawn rather than fork: workers start lazily from inside the event loop,
+    # after aiohttp's resolver threads exist, and forking a threaded process
+    # can deadlock
+    with ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as pool:
+        async with parser.create_async_session() as session:
+            for url in listing_urls:
+                logger.info("Processing listing URL: %s", url)
+                listing_html = await parser.fetch_listing_page_async(session, url)
+                if listing_html is None:
+                    logger.error("Failed to fetch listing page: %s", url)
+                    continue
+
+                certificate_urls = parser.parse_listing_page(listing_html, base_url=url)
+                logger.info("Found %d certificate URLs for listing %s", len(certificate_urls), url)
+
+                tasks = [
+                    _fetch_and_parse(parser, session, cert_url, sem, pool, reference)
+                    for cert_url in certificate_urls
+                ]
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+                for cert_url, result in zip(certificate_urls, results):
+                    if isinstance(result, BaseException):
+                        logger.error("Unexpected error fetching certificate %s: %s", cert_url, result)
+                        continue
+                    if result is not None:
+                        all_records.append(result)
 
     return all_records
 
@@ -116,6 +233,9 @@ def run_from_config(args: argparse.Namespace) -> int:
 
     state_file = Path(config.get("stateFile", "data/epc_state.json")).resolve()
     request_delay = float(config.get("requestDelaySeconds", 0.2))
+    concurrency = int(config.get("concurrency", DEFAULT_CONCURRENCY))
+    if concurrency < 1:
+        raise ValueError(f"Config 'concurrency' must be at least 1, got {concurrency}")
 
     listing_urls = load_input_urls(input_file)
     if not listing_urls:
@@ -125,7 +245,7 @@ def run_from_config(args: argparse.Namespace) -> int:
     parser = EPCParser(delay_seconds=request_delay)
 
     # Full crawl
-    records = crawl_full(listing_urls, parser)
+    records = asyncio.run(crawl_full_async(listing_urls, parser, concurrency=concurrency))
     records = deduplicate_records(records)
 
     if monitoring_mode:
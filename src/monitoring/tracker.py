@@ -1,8 +1,9 @@
-import json
 import logging
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Set, Tuple
 
+import orjson
+
 LOGGER = logging.getLogger("monitoring.tracker")
 
 def load_state(path: Path) -> Set[str]:
@@ -10,22 +11,22 @@ def load_state(path: Path) -> Set[str]:
         LOGGER.info("No previous monitoring state found at %s.", path)
         return set()
     try:
-        with path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = orjson.loads(path.read_bytes())
         if isinstance(data, list):
             return {str(x) for x in data}
         if isinstance(data, dict) and "ids" in data:
             return {str(x) for x in data["ids"]}
         return set()
-    except json.JSONDecodeError as exc:
+    except orjson.JSONDecodeError as exc:
         LOGGER.error("Invalid state file %s: %s", path, exc)
         return set()
 
 def save_state(path: Path, ids: Iterable[str]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    data = {"ids": sorted(set(ids))}
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    # detect_changes already hands over a set; only copy other iterables
+    unique_ids = ids if isinstance(ids, (set, frozenset)) else set(ids)
+    data = {"ids": sorted(unique_ids)}
+    path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
     LOGGER.info("Saved monitoring state (%d IDs) to %s", len(data["ids"]), path)
 
 def detect_changes(
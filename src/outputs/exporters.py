@@ -1,26 +1,47 @@
 import csv
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from html import escape
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Optional
 
+import orjson
 import pandas as pd
-from xml.etree.ElementTree import Element, SubElement, ElementTree
+from lxml import etree
 
 LOGGER = logging.getLogger("outputs.exporters")
 
+# formats rendered from the shared tabular view of the records
+TABULAR_FORMATS = frozenset({"csv", "excel", "xlsx", "html"})
+
 def _ensure_dir(path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
 
+def _cell_value(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+def _records_frame(records: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    One row per record over the sorted union of keys, with nested values
+    flattened to JSON. Built once and shared by the tabular exporters.
+    """
+    fieldnames = sorted({key for rec in records for key in rec.keys()})
+    rows = [[_cell_value(rec.get(key)) for key in fieldnames] for rec in records]
+    return pd.DataFrame(rows, columns=fieldnames, dtype=object)
+
 def export_json(records: List[Dict[str, Any]], path: Path) -> None:
     _ensure_dir(path)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(records, f, ensure_ascii=False, indent=2)
+    path.write_bytes(orjson.dumps(records, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     LOGGER.info("Wrote JSON to %s", path)
 
-def export_csv(records: List[Dict[str, Any]], path: Path) -> None:
+def export_csv(
+    records: List[Dict[str, Any]],
+    path: Path,
+    frame: Optional[pd.DataFrame] = None,
+) -> None:
     _ensure_dir(path)
     if not records:
         with path.open("w", encoding="utf-8", newline="") as f:
@@ -28,39 +49,52 @@ def export_csv(records: List[Dict[str, Any]], path: Path) -> None:
         LOGGER.info("Wrote empty CSV to %s", path)
         return
 
-    fieldnames = sorted(
-        {key for rec in records for key in rec.keys()}
-    )
+    if frame is None:
+        frame = _records_frame(records)
+    # cells are already flattened to scalars, so the frame's row tuples go
+    # straight to csv.writer instead of through DataFrame.to_csv
     with path.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for rec in records:
-            writer.writerow(rec)
+        writer = csv.writer(f)
+        writer.writerow(frame.columns)
+        writer.writerows(frame.itertuples(index=False, name=None))
     LOGGER.info("Wrote CSV to %s", path)
 
-def export_excel(records: List[Dict[str, Any]], path: Path) -> None:
+def export_excel(
+    records: List[Dict[str, Any]],
+    path: Path,
+    frame: Optional[pd.DataFrame] = None,
+) -> None:
     _ensure_dir(path)
-    df = pd.DataFrame.from_records(records)
-    df.to_excel(path, index=False)
+    if frame is None:
+        frame = _records_frame(records)
+    # keep URLs as plain strings: xlsxwriter caps hyperlinks at 65,530 per
+    # sheet and silently blanks the rest
+    frame.to_excel(
+        path,
+        index=False,
+        engine="xlsxwriter",
+        engine_kwargs={"options": {"strings_to_urls": False}},
+    )
     LOGGER.info("Wrote Excel to %s", path)
 
+def _xml_text(value: Any) -> str:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if value is None:
+        return ""
+    return str(value)
+
 def export_xml(records: List[Dict[str, Any]], path: Path) -> None:
     _ensure_dir(path)
-    root = Element("epcRecords")
-
-    for rec in records:
-        item = SubElement(root, "epcRecord")
-        for key, value in rec.items():
-            child = SubElement(item, key)
-            if isinstance(value, (dict, list)):
-                child.text = json.dumps(value, ensure_ascii=False)
-            elif value is None:
-                child.text = ""
-            else:
-                child.text = str(value)
-
-    tree = ElementTree(root)
-    tree.write(path, encoding="utf-8", xml_declaration=True)
+    # stream one <epcRecord> at a time rather than building the whole tree
+    with etree.xmlfile(str(path), encoding="utf-8") as xf:
+        xf.write_declaration()
+        with xf.element("epcRecords"):
+            for rec in records:
+                item = etree.Element("epcRecord")
+                for key, value in rec.items():
+                    etree.SubElement(item, key).text = _xml_text(value)
+                xf.write(item)
     LOGGER.info("Wrote XML to %s", path)
 
 def export_rss(records: List[Dict[str, Any]], path: Path) -> None:
@@ -68,69 +102,69 @@ def export_rss(records: List[Dict[str, Any]], path: Path) -> None:
     channel_title = "EPC Updates"
     channel_link = "https://find-energy-certificate.service.gov.uk"
     channel_desc = "Updates from EPC Data Scraper."
+    last_build = datetime.now(timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT")
+
+    with etree.xmlfile(str(path), encoding="utf-8") as xf:
+        xf.write_declaration()
+        with xf.element("rss", version="2.0"), xf.element("channel"):
+            for tag, text in (
+                ("title", channel_title),
+                ("link", channel_link),
+                ("description", channel_desc),
+                ("lastBuildDate", last_build),
+            ):
+                el = etree.Element(tag)
+                el.text = text
+                xf.write(el)
 
-    rss = Element("rss", version="2.0")
-    channel = SubElement(rss, "channel")
-
-    SubElement(channel, "title").text = channel_title
-    SubElement(channel, "link").text = channel_link
-    SubElement(channel, "description").text = channel_desc
-    SubElement(channel, "lastBuildDate").text = datetime.utcnow().strftime(
-        "%a, %d %b %Y %H:%M:%S GMT"
-    )
-
-    for rec in records:
-        item = SubElement(channel, "item")
-        title = rec.get("address") or rec.get("id") or "EPC record"
-        link = rec.get("url") or channel_link
-        description = f"Rating: {rec.get('rating')}, Postcode: {rec.get('postCode')}"
-        guid = rec.get("id") or f"anon-{id(rec)}"
-
-        SubElement(item, "title").text = title
-        SubElement(item, "link").text = link
-        SubElement(item, "description").text = description
-        SubElement(item, "guid").text = str(guid)
-
-    tree = ElementTree(rss)
-    tree.write(path, encoding="utf-8", xml_declaration=True)
+            for rec in records:
+                item = etree.Element("item")
+                title = rec.get("address") or rec.get("id") or "EPC record"
+                link = rec.get("url") or channel_link
+                description = f"Rating: {rec.get('rating')}, Postcode: {rec.get('postCode')}"
+                guid = rec.get("id") or f"anon-{id(rec)}"
+
+                etree.SubElement(item, "title").text = title
+                etree.SubElement(item, "link").text = link
+                etree.SubElement(item, "description").text = description
+                etree.SubElement(item, "guid").text = str(guid)
+                xf.write(item)
     LOGGER.info("Wrote RSS feed to %s", path)
 
-def export_html(records: List[Dict[str, Any]], path: Path) -> None:
+def export_html(
+    records: List[Dict[str, Any]],
+    path: Path,
+    frame: Optional[pd.DataFrame] = None,
+) -> None:
     _ensure_dir(path)
-    with path.open("w", encoding="utf-8") as f:
-        f.write("<!DOCTYPE html>\n<html><head><meta charset='utf-8'>\n")
-        f.write("<title>EPC Results</title>\n")
-        f.write(
-            "<style>body{font-family:Arial,Helvetica,sans-serif;margin:20px;}table{border-collapse:collapse;width:100%;}th,td{border:1px solid #ccc;padding:6px;font-size:13px;}th{background:#f4f4f4;}</style>\n"
-        )
-        f.write("</head><body>\n")
-        f.write("<h1>EPC Results</h1>\n")
-
-        if not records:
-            f.write("<p>No records.</p>")
-        else:
-            fields = sorted({key for rec in records for key in rec.keys()})
-            f.write("<table>\n<thead><tr>")
-            for field in fields:
-                f.write(f"<th>{escape(field)}</th>")
-            f.write("</tr></thead>\n<tbody>\n")
+    parts: List[str] = [
+        "<!DOCTYPE html>\n<html><head><meta charset='utf-8'>\n",
+        "<title>EPC Results</title>\n",
+        "<style>body{font-family:Arial,Helvetica,sans-serif;margin:20px;}table{border-collapse:collapse;width:100%;}th,td{border:1px solid #ccc;padding:6px;font-size:13px;}th{background:#f4f4f4;}</style>\n",
+        "</head><body>\n",
+        "<h1>EPC Results</h1>\n",
+    ]
 
-            for rec in records:
-                f.write("<tr>")
-                for field in fields:
-                    val = rec.get(field)
-                    if isinstance(val, (dict, list)):
-                        text = json.dumps(val, ensure_ascii=False)
-                    elif val is None:
-                        text = ""
-                    else:
-                        text = str(val)
-                    f.write(f"<td>{escape(text)}</td>")
-                f.write("</tr>\n")
-
-            f.write("</tbody></table>\n")
-
-        f.write("</body></html>")
+    if not records:
+        parts.append("<p>No records.</p>")
+    else:
+        if frame is None:
+            frame = _records_frame(records)
+        parts.append("<table>\n<thead><tr>")
+        parts.extend(f"<th>{escape(field)}</th>" for field in frame.columns)
+        parts.append("</tr></thead>\n<tbody>\n")
+
+        for row in frame.itertuples(index=False, name=None):
+            cells = "".join(
+                f"<td>{escape('' if val is None else str(val))}</td>" for val in row
+            )
+            parts.append(f"<tr>{cells}</tr>\n")
+
+        parts.append("</tbody></table>\n")
+
+    parts.append("</body></html>")
+    with path.open("w", encoding="utf-8") as f:
+        f.write("".join(parts))
     LOGGER.info("Wrote HTML table to %s", path)
 
 def export_all(
@@ -142,15 +176,17 @@ def export_all(
     format_set = {fmt.lower() for fmt in formats}
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    frame = _records_frame(records) if format_set & TABULAR_FORMATS else None
+
     if "json" in format_set:
         export_json(records, output_dir / f"{base_name}.json")
     if "csv" in format_set:
-        export_csv(records, output_dir / f"{base_name}.csv")
+        export_csv(records, output_dir / f"{base_name}.csv", frame=frame)
     if "excel" in format_set or "xlsx" in format_set:
-        export_excel(records, output_dir / f"{base_name}.xlsx")
+        export_excel(records, output_dir / f"{base_name}.xlsx", frame=frame)
     if "xml" in format_set:
         export_xml(records, output_dir / f"{base_name}.xml")
     if "rss" in format_set:
         export_rss(records, output_dir / f"{base_name}.rss.xml")
     if "html" in format_set:
-        export_html(records, output_dir / f"{base_name}.html")
\ No newline at end of file
+        export_html(records, output_dir / f"{base_name}.html", frame=frame)
\ No newline at end of file